@@ -1,29 +1,30 @@
-from datetime import datetime
-from zoneinfo import ZoneInfo
+import asyncio
+import logging
+import re
+from contextlib import asynccontextmanager
 from dotenv import dotenv_values
-from flask import Flask, request, abort
-from linebot.v3 import WebhookHandler
+from fastapi import BackgroundTasks, FastAPI, Request, HTTPException
 from linebot.v3.exceptions import InvalidSignatureError
 from linebot.v3.messaging import (
     Configuration,
-    ApiClient,
-    MessagingApi,
+    AsyncApiClient,
+    AsyncMessagingApi,
     ReplyMessageRequest,
     TextMessage,
     QuickReply,
     QuickReplyItem,
     LocationAction,
     PostbackAction,
-    MessageAction,
 )
 from linebot.v3.webhooks import (
     MessageEvent,
     TextMessageContent,
     LocationMessageContent,
     PostbackEvent,
-    LocationMessageContent,
 )
 
+from feature.line.async_webhook_handler import AsyncWebhookHandler
+from feature.line.orjson_serializer import install_orjson_serializer
 from feature.line.rich_menu import RichMenuManager
 from feature.line.handlers.command_handler import CommandHandler
 from feature.line.handlers.favorite_handler import FavoriteHandler
@@ -34,9 +35,11 @@ from feature.line.handlers.scenario_handler import (
     user_queries,
     recent_recommendations
 )
+from feature.line.user_state_cache import LRU
+from feature.nosql_mongo.mongo_trip.batcher import write_batcher
 from feature.nosql_mongo.mongo_trip.db_helper import trip_db
 import os
-trip_user_states = {}
+trip_user_states = LRU()
 
 # 載入 .env 檔案中的環境變數
 config = dotenv_values("./.env")
@@ -58,49 +61,118 @@ if len(config) == 0:
 LINE_CHANNEL_ACCESS_TOKEN = config["LINE_CHANNEL_ACCESS_TOKEN"]
 LINE_CHANNEL_SECRET = config["LINE_CHANNEL_SECRET"]
 
-# 初始化 Flask 應用
-app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
+# 送出的 reply 訊息改用 orjson 序列化
+install_orjson_serializer()
 
 # 初始化 Configuration, WebhookHandler, RichMenuManager
 configuration = Configuration(access_token=LINE_CHANNEL_ACCESS_TOKEN)
-handler = WebhookHandler(LINE_CHANNEL_SECRET)
-
-try:
-    rich_menu_manager = RichMenuManager(LINE_CHANNEL_ACCESS_TOKEN)
-    menu_ids = rich_menu_manager.create_rich_menu()
-    if menu_ids[0] is None:
-        print("Rich Menu 建立失敗,但程式將繼續執行")
-    else:
-        print("Rich Menu 建立成功")
-except Exception as e:
-    print(f"Rich Menu 初始化出錯,但程式將繼續執行: {str(e)}")
-
-
-@app.route("/callback", methods=['POST'])
-def callback():
-    app.logger.info("Received webhook request")
-    app.logger.info(f"Headers: {request.headers}")
-    app.logger.info(f"Body: {request.get_data(as_text=True)}")
-    # 取得 X-Line-Signature 標頭值
-    signature = request.headers['X-Line-Signature']
-
-    # 取得請求的 body 內容
-    body = request.get_data(as_text=True)
-    app.logger.info("Request body: " + body)
+handler = AsyncWebhookHandler(LINE_CHANNEL_SECRET)
+
+# 所有事件共用同一個 AsyncApiClient (內含單一 aiohttp.ClientSession)
+# 在 lifespan 啟動時建立, 關閉時釋放
+async_api_client = None
+messaging_api = None
+
+# 各功能的 handler 只保存設定與共用 client, 在 lifespan 建立一次後所有事件共用
+_handlers = {}
+
+# 固定內容的回覆訊息, 啟動時建立一次重複使用
+_TRIP_PLANNING_QUICK_REPLY = QuickReply(
+    items=[
+        # 位置分享按鈕
+        QuickReplyItem(
+            action=LocationAction(
+                label="指定起點開始規劃"
+            )
+        ),
+        # 隨機規劃按鈕
+        QuickReplyItem(
+            action=PostbackAction(
+                label="直接開始規劃",
+                data="action=direct_plan"
+            )
+        )
+    ]
+)
+_TRIP_PLANNING_TEXT = TextMessage(
+    text="請選擇規劃方式",
+    quick_reply=_TRIP_PLANNING_QUICK_REPLY
+)
+# 取消按鈕格式: cancel_{plan_index}_{step}_{name}_{label}, 店名可能含有底線
+_CANCEL_RE = re.compile(r"^cancel_(\d+)_(\d+)_(.+)_([^_]+)$")
+
+_POSTBACK_ERROR_TEXT = TextMessage(text="處理請求時發生錯誤，請稍後再試")
+_MESSAGE_ERROR_TEXT = TextMessage(text="處理訊息時發生錯誤，請稍後再試")
+
+
+def _ensure_rich_menu():
+    """建立 Rich Menu, 失敗時只記錄不中斷服務"""
+    try:
+        rich_menu_manager = RichMenuManager(LINE_CHANNEL_ACCESS_TOKEN)
+        menu_ids = rich_menu_manager.create_rich_menu()
+        if menu_ids[0] is None:
+            print("Rich Menu 建立失敗,但程式將繼續執行")
+        else:
+            print("Rich Menu 建立成功")
+    except Exception as e:
+        print(f"Rich Menu 初始化出錯,但程式將繼續執行: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """建立並釋放共用的 LINE Messaging API client"""
+    global async_api_client, messaging_api
+    async_api_client = AsyncApiClient(configuration)
+    messaging_api = AsyncMessagingApi(async_api_client)
+    _handlers.update(
+        command=CommandHandler(messaging_api, logger),
+        scenario=ScenarioHandler(messaging_api, config, logger),
+        recommend=RecommendHandler(messaging_api, config, logger),
+        favorite=FavoriteHandler(messaging_api, config, logger),
+    )
+    # Rich Menu 在背景建立, 不在 import 時呼叫 LINE API, 也不延後服務開始接收請求
+    app.state.rich_menu_task = asyncio.create_task(
+        asyncio.to_thread(_ensure_rich_menu))
+    yield
+    await write_batcher.close()
+    await async_api_client.close()
+
+
+# 初始化 FastAPI 應用
+app = FastAPI(lifespan=lifespan)
+
+
+
+@app.post("/callback")
+async def callback(request: Request, background_tasks: BackgroundTasks):
+    # 取得 X-Line-Signature 標頭值 (標頭含簽名, 不記錄)
+    signature = request.headers.get('X-Line-Signature')
+    if signature is None:
+        raise HTTPException(status_code=400)  # 沒有簽名標頭, 返回 400 錯誤碼
+
+    # 取得請求的 body 內容, 只記錄長度
+    raw_body = await request.body()
+    logger.debug("body len=%d", len(raw_body))
+    body = raw_body.decode()
 
     # 簽名驗證
     try:
-        handler.handle(body, signature)  # 使用 handler 來處理簽名驗證
+        events = handler.parse_events(body, signature)  # 使用 handler 來處理簽名驗證
     except InvalidSignatureError:
-        app.logger.error(
+        logger.error(
             "Invalid signature. Please check your channel access token/channel secret.")
-        abort(400)  # 若簽名無效，返回 400 錯誤碼
+        raise HTTPException(status_code=400)  # 若簽名無效，返回 400 錯誤碼
+
+    # 先回覆 LINE 200, 事件在回應送出後才處理, 避免 webhook 逾時重送
+    background_tasks.add_task(handler.dispatch_async, events)
 
     return 'OK'
 
 
 @handler.add(PostbackEvent)
-def handle_postback(event):
+async def handle_postback(event):
     """處理postback事件
 
     Args:
@@ -116,107 +188,118 @@ def handle_postback(event):
     """
     data = event.postback.data
     line_id = event.source.user_id
+    reply_token = event.reply_token
 
-    if line_id in trip_user_states and not data.startswith("action=trip_planning"):
-        del trip_user_states[line_id]
+    is_trip_planning = data.startswith("action=trip_planning")
+    if not is_trip_planning:
+        trip_user_states.pop(line_id, None)
 
     try:
-        with ApiClient(configuration) as api_client:
-            messaging_api = MessagingApi(api_client)
-            command_handler = CommandHandler(messaging_api, app.logger)
-
-            if data.startswith("action=trip_planning"):
-                trip_user_states[line_id] = "waiting_location"
-
-                # 建立Quick Reply選項
-                quick_reply = QuickReply(
-                    items=[
-                        # 位置分享按鈕
-                        QuickReplyItem(
-                            action=LocationAction(
-                                label="指定起點開始規劃"
-                            )
-                        ),
-                        # 隨機規劃按鈕
-                        QuickReplyItem(
-                            action=PostbackAction(
-                                label="直接開始規劃",
-                                data="action=direct_plan"
-                            )
-                        )
-                    ]
-                )
+        command_handler = _handlers["command"]
 
-                # 發送Quick Reply訊息
-                messaging_api.reply_message_with_http_info(
-                    ReplyMessageRequest(
-                        reply_token=event.reply_token,
-                        messages=[
-                            TextMessage(
-                                text="請選擇規劃方式",
-                                quick_reply=quick_reply
-                            )
-                        ]
-                    )
-                )
-            elif data == "action=direct_plan":
-                command_handler.handle_trip_command(event, None, line_id)
-
-            elif data.startswith("cancel_"):
-                # 解析出地點index和資訊
-                parts = data.split("_")
-                if len(parts) != 5:
-                    print("按鈕格式錯誤: {data}")
-                    return
-
-                _, plan_index, step, name, label = parts
-                plan_index = int(plan_index)
-                step = int(step)
-
-                # 更新行程的restart_index
-                button_id = f"cancel_{plan_index}_{step}"
-                success = trip_db.update_plan_restart_index(
-                    line_id=line_id,
-                    plan_index=plan_index,
-                    restart_index=step,
-                    button_id=button_id,
+        if is_trip_planning:
+            trip_user_states[line_id] = "waiting_location"
+
+            # 發送Quick Reply訊息
+            await messaging_api.reply_message_with_http_info(
+                ReplyMessageRequest(
+                    reply_token=reply_token,
+                    messages=[_TRIP_PLANNING_TEXT]
                 )
-                print(f"更新結果: {success}, button_id: {button_id}")
-
-                if success:
-                    # 更新用戶偏好
-                    dislike_reason = f"我不喜歡{name}({label})"
-                    trip_db.update_user_dislike(line_id, dislike_reason)
-
-                    dislike_button_text = f"已紀錄您不喜歡{name}({label})"
-                else:
-                    dislike_button_text = f"別再按啦! 我已經知道您不喜歡{name}({label})"
-
-                messaging_api.reply_message(
-                    ReplyMessageRequest(
-                        reply_token=event.reply_token,
-                        messages=[TextMessage(text=dislike_button_text)]
-                    )
+            )
+        elif data == "action=direct_plan":
+            await command_handler.handle_trip_command(event, None, line_id)
+
+        elif data.startswith("cancel_"):
+            # 解析出地點index和資訊
+            match = _CANCEL_RE.match(data)
+            if match is None:
+                logger.warning("按鈕格式錯誤: %s", data)
+                return
+
+            plan_index, step = int(match[1]), int(match[2])
+            name, label = match[3], match[4]
+
+            # 更新行程的restart_index, 成功時一併更新用戶偏好
+            button_id = f"cancel_{plan_index}_{step}"
+            success = await trip_db.record_cancel_and_dislike(
+                line_id=line_id,
+                plan_index=plan_index,
+                restart_index=step,
+                button_id=button_id,
+                dislike_reason=f"我不喜歡{name}({label})",
+            )
+            print(f"更新結果: {success}, button_id: {button_id}")
+
+            if success:
+                dislike_button_text = f"已紀錄您不喜歡{name}({label})"
+            else:
+                dislike_button_text = f"別再按啦! 我已經知道您不喜歡{name}({label})"
+
+            await messaging_api.reply_message(
+                ReplyMessageRequest(
+                    reply_token=reply_token,
+                    messages=[TextMessage(text=dislike_button_text)]
                 )
+            )
 
     except Exception as e:
-        app.logger.error(f"處理postback時發生錯誤: {str(e)}")
+        logger.error(f"處理postback時發生錯誤: {str(e)}")
         try:
-            with ApiClient(configuration) as api_client:
-                messaging_api = MessagingApi(api_client)
-                messaging_api.reply_message_with_http_info(
-                    ReplyMessageRequest(
-                        reply_token=event.reply_token,
-                        messages=[TextMessage(text="處理請求時發生錯誤，請稍後再試")]
-                    )
+            await messaging_api.reply_message_with_http_info(
+                ReplyMessageRequest(
+                    reply_token=reply_token,
+                    messages=[_POSTBACK_ERROR_TEXT]
                 )
+            )
         except Exception as inner_e:
-            app.logger.error(f"Error sending error message: {str(inner_e)}")
-
+            logger.error(f"Error sending error message: {str(inner_e)}")
+
+
+
+# ======================================================文字指令分派表
+# 每個處理函式都是 (handlers, event, parameter, line_id) -> coroutine
+
+# 優先處理的指令 (即使正在情境搜索中), key 為 parse_command 回傳的指令種類
+_EXACT_COMMANDS = {
+    # 使用說明
+    "help": lambda h, event, parameter, line_id:
+        h["command"].handle_help_command(event),
+    "trip_help": lambda h, event, parameter, line_id:
+        h["command"].handle_trip_help(event),
+    "search_help": lambda h, event, parameter, line_id:
+        h["command"].handle_search_help(event),
+    # 旅遊推薦
+    "trip": lambda h, event, parameter, line_id:
+        h["command"].handle_trip_command(event, parameter, line_id),
+    "init": lambda h, event, parameter, line_id:
+        h["command"].handle_init_command(event, line_id),
+    # 情境搜索
+    "scenario_search": lambda h, event, parameter, line_id:
+        h["scenario"].handle_scenario_search(event),
+}
+
+
+def _handle_user_query(h, event, parameter, line_id):
+    return h["scenario"].handle_user_query(event)
+
+
+# 不在情境搜索流程中才處理的指令
+_FAVORITE_COMMANDS = {
+    "show_favorites": lambda h, event, parameter, line_id:
+        h["favorite"].show_favorites(event, recent_recommendations),
+    "recommend_others": lambda h, event, parameter, line_id:
+        h["recommend"].recommend_others(
+            event, recent_recommendations, user_queries),
+    "add_favorite": lambda h, event, parameter, line_id:
+        h["favorite"].add_favorite(event, recent_recommendations),
+    "remove_favorite": lambda h, event, parameter, line_id:
+        h["favorite"].remove_favorite(event),
+}
 
 
 @handler.add(MessageEvent, message=TextMessageContent)
-def handle_message(event):
+async def handle_message(event):
     """處理使用者傳送的文字訊息
 
     Args:
@@ -225,132 +308,77 @@ def handle_message(event):
 
     text_message = event.message.text
     line_id = event.source.user_id
+    reply_token = event.reply_token
 
-    if line_id in trip_user_states:
-        del trip_user_states[line_id]
+    trip_user_states.pop(line_id, None)
 
-    if trip_db.record_user_input(line_id, text_message):
+    if await trip_db.record_user_input_async(line_id, text_message):
         print(f"已記錄{line_id}說:{text_message}")
 
     try:
-        with ApiClient(configuration) as api_client:
-            messaging_api = MessagingApi(api_client)
-            command_handler = CommandHandler(messaging_api, app.logger)
-            scenario_handler = ScenarioHandler(
-                messaging_api, config, app.logger)
-            recommend_handler = RecommendHandler(
-                messaging_api, config, app.logger)
-            favorite_handler = FavoriteHandler(
-                messaging_api, config, app.logger)
-
-            # 解析與處理指令
-            command, parameter = command_handler.parse_command(text_message)
-
-    # ======================================================以下是使用說明
-            if command == "使用說明":
-                command_handler.handle_help_command(event)
-            elif command == "旅遊規劃說明":
-                command_handler.handle_trip_help(event)
-            elif command == "情境搜索說明":
-                command_handler.handle_search_help(event)
-
-    # ======================================================以下是旅遊推薦
-            elif command == "旅遊推薦":
-                command_handler.handle_trip_command(event, parameter, line_id)
-            elif command == "紀錄初始化":
-                command_handler.handle_init_command(event, line_id)
-
-    # ======================================================以下是情境搜索
-
-            # 情境搜索相關功能處理
-            elif command == "我想進行情境搜索":
-                scenario_handler.handle_scenario_search(event)
-
-            # 處理情境搜索的查詢輸入
-            elif line_id in user_states:
-                scenario_handler.handle_user_query(event)
-
-            # 處理顯示收藏
-            elif command == "顯示我的收藏":
-                favorite_handler.show_favorites(
-                    event, recent_recommendations)
-
-            # 處理收藏店家
-            elif command.startswith("收藏店家:"):
-                favorite_handler.add_favorite(
-                    event, recent_recommendations)
-
-            # 處理移除收藏
-            elif command.startswith("移除"):
-                favorite_handler.remove_favorite(event)
-
-            # 處理推薦其他店家
-            elif command == "推薦其他店家":
-                recommend_handler.recommend_others(
-                    event,
-                    recent_recommendations,
-                    user_queries,
-                )
+        # 解析與處理指令
+        command, parameter = _handlers["command"].parse_command(text_message)
+
+        handle = _EXACT_COMMANDS.get(command)
+        if handle is None:
+            if user_states.touch(line_id):
+                # 處理情境搜索的查詢輸入
+                handle = _handle_user_query
+            else:
+                handle = _FAVORITE_COMMANDS.get(command)
+
+        if handle is not None:
+            await handle(_handlers, event, parameter, line_id)
 
     except Exception as e:
-        app.logger.error(f"Error handling message: {str(e)}")
+        logger.error(f"Error handling message: {str(e)}")
         try:
-            with ApiClient(configuration) as api_client:
-                messaging_api = MessagingApi(api_client)
-                messaging_api.reply_message_with_http_info(
-                    ReplyMessageRequest(
-                        reply_token=event.reply_token,
-                        messages=[TextMessage(text="處理訊息時發生錯誤，請稍後再試")]
-                    )
+            await messaging_api.reply_message_with_http_info(
+                ReplyMessageRequest(
+                    reply_token=reply_token,
+                    messages=[_MESSAGE_ERROR_TEXT]
                 )
+            )
         except Exception as inner_e:
-            app.logger.error(f"Error sending error message: {str(inner_e)}")
+            logger.error(f"Error sending error message: {str(inner_e)}")
 
 @handler.add(MessageEvent, message=LocationMessageContent)
-def handle_location(event):
+async def handle_location(event):
     """處理用戶發送的位置訊息"""
+    line_id = event.source.user_id
+    reply_token = event.reply_token
+
     try:
         # 檢查用戶是否在等待位置狀態
-        user_id = event.source.user_id
-        if user_id in user_states and user_states[user_id] == "waiting_for_location":
-            with ApiClient(configuration) as api_client:
-                messaging_api = MessagingApi(api_client)
-                scenario_handler = ScenarioHandler(messaging_api, config, app.logger)
-                scenario_handler.handle_location(event)
+        if user_states.get(line_id) == "waiting_for_location":
+            await _handlers["scenario"].handle_location(event)
 
         # -----以下為旅遊推薦-------------------------------
-        line_id = event.source.user_id
-        if line_id in trip_user_states and trip_user_states[line_id] == "waiting_location":
+        if trip_user_states.pop(line_id, None) == "waiting_location":
             # 準備位置資訊
+            message = event.message
             location = {
-                "lat": event.message.latitude,
-                "lon": event.message.longitude,
-                "address": event.message.address,
-                "time": datetime.now(ZoneInfo('Asia/Taipei'))
+                "lat": message.latitude,
+                "lon": message.longitude,
+                "address": message.address,
             }
             # 儲存到MongoDB
-            trip_db.update_user_location(line_id, location)
-            
-            with ApiClient(configuration) as api_client:
-                messaging_api = MessagingApi(api_client)
-                command_handler = CommandHandler(messaging_api, app.logger)
-                command_handler.handle_trip_command(event, None, line_id)
+            await asyncio.to_thread(trip_db.update_user_location, line_id, location)
 
-            del trip_user_states[line_id]
+            await _handlers["command"].handle_trip_command(event, None, line_id)
     except Exception as e:
-        app.logger.error(f"處理位置訊息時發生錯誤: {str(e)}")
+        logger.error(f"處理位置訊息時發生錯誤: {str(e)}")
         try:
-            with ApiClient(configuration) as api_client:
-                messaging_api = MessagingApi(api_client)
-                messaging_api.reply_message(
-                    ReplyMessageRequest(
-                        reply_token=event.reply_token,
-                        messages=[TextMessage(text="處理位置資訊時發生錯誤，請稍後再試")]
-                    )
+            await messaging_api.reply_message(
+                ReplyMessageRequest(
+                    reply_token=reply_token,
+                    messages=[TextMessage(text="處理位置資訊時發生錯誤，請稍後再試")]
                 )
+            )
         except Exception as inner_e:
-            app.logger.error(f"發送錯誤訊息失敗: {str(inner_e)}")
+            logger.error(f"發送錯誤訊息失敗: {str(inner_e)}")
             
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=8080)
+    import uvicorn
+    uvicorn.run("app:app", host="0.0.0.0", port=8080, reload=True)
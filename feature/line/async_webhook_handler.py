@@ -0,0 +1,94 @@
+"""
+LINE Webhook 的非同步分派器
+
+line-bot-sdk v3 的 WebhookHandler 只會同步呼叫 handler,
+這裡沿用它的 @handler.add 註冊方式, 但改成 await 每個 async handler,
+讓 FastAPI 的 event loop 可以同時處理多個事件的 I/O。
+"""
+
+import inspect
+import logging
+
+from linebot.v3 import WebhookHandler
+from linebot.v3.webhooks import MessageEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWebhookHandler(WebhookHandler):
+    """支援 async handler 的 WebhookHandler
+
+    使用方式:
+    ```python
+    handler = AsyncWebhookHandler(LINE_CHANNEL_SECRET)
+
+    @handler.add(MessageEvent, message=TextMessageContent)
+    async def handle_message(event):
+        ...
+
+    await handler.handle_async(body, signature)
+
+    # 或先驗證簽名、回覆 LINE 之後再處理事件
+    events = handler.parse_events(body, signature)
+    await handler.dispatch_async(events)
+    ```
+    """
+
+    async def handle_async(self, body: str, signature: str):
+        """驗證簽名並依序 await 對應的 handler
+
+        Args:
+            body: Webhook request body (as text)
+            signature: X-Line-Signature 標頭值
+
+        Raises:
+            InvalidSignatureError: 簽名驗證失敗
+        """
+        await self.dispatch_async(self.parse_events(body, signature))
+
+    def parse_events(self, body: str, signature: str) -> list:
+        """驗證簽名並解析出事件列表
+
+        Args:
+            body: Webhook request body (as text)
+            signature: X-Line-Signature 標頭值
+
+        Returns:
+            list: webhook 內的事件
+
+        Raises:
+            InvalidSignatureError: 簽名驗證失敗
+        """
+        return self.parser.parse(body, signature, as_payload=True).events
+
+    async def dispatch_async(self, events: list):
+        """依序 await 每個事件對應的 handler
+
+        Args:
+            events: parse_events 解析出的事件列表
+        """
+        for event in events:
+            func = self._find_handler(event)
+            if func is None:
+                logger.info(f"沒有對應 {event.__class__.__name__} 的 handler")
+                continue
+
+            result = func(event)
+            if inspect.isawaitable(result):
+                await result
+
+    def _find_handler(self, event):
+        """依照 WebhookHandler 的規則找出事件對應的 handler"""
+        func = None
+
+        if isinstance(event, MessageEvent):
+            func = self._handlers.get(
+                f"{event.__class__.__name__}_{event.message.__class__.__name__}")
+
+        if func is None:
+            func = self._handlers.get(event.__class__.__name__)
+
+        if func is None:
+            func = self._default
+
+        return func
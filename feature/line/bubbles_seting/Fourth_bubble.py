@@ -1,5 +1,5 @@
 
-def Fourth():
+def Fourth(rainfall_pct="65%", temp_range="14-18°C", humidity_pct="86%"):
     rainfall = {
         "type": "text",
         "text": "降雨機率:",
@@ -8,7 +8,7 @@ def Fourth():
     }
     rainfall_por={
         "type": "text",
-        "text": "65%",
+        "text": rainfall_pct,
         "size": "sm",
         "align": "end"
     }
@@ -21,7 +21,7 @@ def Fourth():
     }
     temperature={
         "type": "text",
-        "text": "14-18°C",
+        "text": temp_range,
         "size": "sm",
         "align": "end"
     }
@@ -34,7 +34,7 @@ def Fourth():
     }
     humidity_pro={
         "type": "text",
-        "text": "86%",
+        "text": humidity_pct,
         "size": "sm",
         "align": "end"
     }
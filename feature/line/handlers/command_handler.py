@@ -7,33 +7,52 @@
 3. 處理LINE訊息回覆
 """
 
+import asyncio
+import re
+
 from linebot.v3.messaging import (
-    MessagingApi,
+    AsyncMessagingApi,
     ReplyMessageRequest,
     TextMessage, FlexMessage,
     FlexContainer
 )
 from linebot.v3.webhooks import MessageEvent
-from typing import Tuple
+from typing import Optional, Tuple
 from feature.line.bubbles_seting.First_bubble import First
 from feature.nosql_mongo.mongo_trip.db_helper import trip_db
 from main.main_trip.trip_service import run_trip_planner
 
+# 文字指令的文法, 命中的群組名稱即為指令種類
+# "旅遊推薦"/"旅遊規劃"後面可接參數, 但"旅遊規劃說明"開頭的不算
+_COMMAND_RE = re.compile(
+    r"(?P<help>使用說明)"
+    r"|(?P<trip_help>旅遊規劃說明)"
+    r"|(?P<search_help>情境搜索說明)"
+    r"|旅遊(?:推薦|規劃(?!說明))(?P<trip>.*)"
+    r"|(?P<init>[紀記]錄初始化)"
+    r"|(?P<scenario_search>我想進行情境搜索)"
+    r"|(?P<show_favorites>顯示我的收藏)"
+    r"|(?P<recommend_others>推薦其他店家)"
+    r"|(?P<add_favorite>收藏店家:.*)"
+    r"|(?P<remove_favorite>移除.*)",
+    re.DOTALL,
+)
+
 
 class CommandHandler:
     """LINE Bot指令處理器"""
 
-    def __init__(self, messaging_api: MessagingApi, logger=None):
+    def __init__(self, messaging_api: AsyncMessagingApi, logger=None):
         """初始化
 
         Args:
-            messaging_api: LINE Bot的MessagingApi實例
+            messaging_api: LINE Bot的AsyncMessagingApi實例
             logger: 可選的logger實例,用於記錄訊息
         """
         self.messaging_api = messaging_api
         self.logger = logger
 
-    def parse_command(self, text: str) -> Tuple[str, str]:
+    def parse_command(self, text: str) -> Tuple[Optional[str], Optional[str]]:
         """解析使用者輸入的command和參數
 
         Args:
@@ -41,26 +60,22 @@ class CommandHandler:
 
         Returns:
             tuple[str, str]: (command, parameter)
-            - command: 指令名稱,如果非指令則為原始文字
+            - command: 指令種類(_COMMAND_RE的群組名稱),非指令則為None
             - parameter: 參數內容,沒有參數則為None
         """
-        # 判斷旅遊推薦指令
-        # 允許純"旅遊推薦"或"旅遊推薦 XXX"兩種格式
-        if text == "旅遊推薦" or text == "旅遊規劃":
-            return "旅遊推薦", None
-        if text.startswith("旅遊推薦") or text.startswith("旅遊規劃"):
-            if not text.startswith("旅遊規劃說明"):
-                return "旅遊推薦", text[4:].strip()
-
-        # 判斷記錄初始化指令
-        # 只接受純"記錄初始化"五個字
-        if text in ["記錄初始化", "紀錄初始化"]:
-            return "紀錄初始化", None
-
-        # 其他指令直接返回原始文字,無參數
-        return text, None
-
-    def handle_trip_command(
+        match = _COMMAND_RE.fullmatch(text)
+        if match is None:
+            return None, None
+
+        command = match.lastgroup
+        if command == "trip":
+            # 允許"旅遊推薦 XXX"格式, 純"旅遊推薦"沒有參數
+            parameter = match["trip"]
+            return command, parameter.strip() if parameter else None
+
+        return command, None
+
+    async def handle_trip_command(
         self,
         event: MessageEvent,
         parameter: str,
@@ -75,7 +90,7 @@ class CommandHandler:
         """
         try:
 
-            latest = trip_db.get_latest_plan(line_id)
+            latest = await asyncio.to_thread(trip_db.get_latest_plan, line_id)
             if latest:
                 plan_index = latest.get('plan_index', 1)
             else:
@@ -83,9 +98,11 @@ class CommandHandler:
 
             # 沒有參數時直接傳line_id
             if parameter is None:
-                data = run_trip_planner(text="隨便規劃台北一日遊", line_id=line_id)
+                data = await asyncio.to_thread(
+                    run_trip_planner, text="隨便規劃台北一日遊", line_id=line_id)
             else:
-                data = run_trip_planner(text=parameter, line_id=line_id)
+                data = await asyncio.to_thread(
+                    run_trip_planner, text=parameter, line_id=line_id)
 
             carousel = {
                 "type": "carousel",
@@ -99,7 +116,7 @@ class CommandHandler:
                     contents=FlexContainer.from_dict(carousel)
                 )]
 
-            self.messaging_api.reply_message_with_http_info(
+            await self.messaging_api.reply_message_with_http_info(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=messages
@@ -108,14 +125,14 @@ class CommandHandler:
         except Exception as e:
             if self.logger:
                 self.logger.error(f"處理旅遊推薦時發生錯誤: {str(e)}")
-            self.messaging_api.reply_message_with_http_info(
+            await self.messaging_api.reply_message_with_http_info(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=[TextMessage(text="處理旅遊推薦時發生錯誤，請稍後再試")]
                 )
             )
 
-    def handle_init_command(
+    async def handle_init_command(
         self,
         event: MessageEvent,
         line_id: str
@@ -127,10 +144,10 @@ class CommandHandler:
             line_id: 使用者LINE ID
         """
         try:
-            success = trip_db.clear_user_data(line_id)
+            success = await asyncio.to_thread(trip_db.clear_user_data, line_id)
             message = "初始化成功" if success else "初始化錯誤，請稍後再試"
 
-            self.messaging_api.reply_message_with_http_info(
+            await self.messaging_api.reply_message_with_http_info(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=[TextMessage(text=message)]
@@ -139,32 +156,32 @@ class CommandHandler:
         except Exception as e:
             if self.logger:
                 self.logger.error(f"處理紀錄初始化時發生錯誤: {str(e)}")
-            self.messaging_api.reply_message_with_http_info(
+            await self.messaging_api.reply_message_with_http_info(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=[TextMessage(text="處理紀錄初始化時發生錯誤，請稍後再試")]
                 )
             )
 
-    def handle_help_command(self, event):
+    async def handle_help_command(self, event):
         """快速功能介紹"""
 
-        self._send_text_message(event.reply_token, HELP_TEXT)
+        await self._send_text_message(event.reply_token, HELP_TEXT)
 
-    def handle_trip_help(self, event):
+    async def handle_trip_help(self, event):
         """旅遊規劃功能說明"""
 
-        self._send_text_message(event.reply_token, TRIP_HELP)
+        await self._send_text_message(event.reply_token, TRIP_HELP)
 
-    def handle_search_help(self, event):
+    async def handle_search_help(self, event):
         """情境搜索功能說明"""
 
-        self._send_text_message(event.reply_token, SEARCH_HELP)
+        await self._send_text_message(event.reply_token, SEARCH_HELP)
 
-    def _send_text_message(self, reply_token: str, text: str):
+    async def _send_text_message(self, reply_token: str, text: str):
         """發送文字訊息"""
         try:
-            self.messaging_api.reply_message_with_http_info(
+            await self.messaging_api.reply_message_with_http_info(
                 ReplyMessageRequest(
                     reply_token=reply_token,
                     messages=[TextMessage(text=text)]
@@ -7,7 +7,9 @@
 3. 移除收藏
 """
 
-from linebot.v3.messaging import MessagingApi, ReplyMessageRequest, TextMessage, FlexMessage, FlexContainer
+import asyncio
+
+from linebot.v3.messaging import AsyncMessagingApi, ReplyMessageRequest, TextMessage, FlexMessage, FlexContainer
 from linebot.v3.webhooks import MessageEvent
 
 from feature.line.rec_bubble_setting.line_bubble_favo import generate_remove_flex_messages
@@ -17,11 +19,11 @@ from feature.nosql_mongo.mongo_rec.mongoDB_ctrl_favo import MongoDBManage_favori
 class FavoriteHandler:
     """收藏功能處理器"""
 
-    def __init__(self, messaging_api: MessagingApi, config: dict, logger=None):
+    def __init__(self, messaging_api: AsyncMessagingApi, config: dict, logger=None):
         """初始化
 
         Args:
-            messaging_api: LINE Bot的MessagingApi實例
+            messaging_api: LINE Bot的AsyncMessagingApi實例
             config: 設定檔內容
             logger: 可選的logger實例
         """
@@ -29,7 +31,7 @@ class FavoriteHandler:
         self.config = config
         self.logger = logger
 
-    def show_favorites(self, event: MessageEvent, recent_recommendations: dict):
+    async def show_favorites(self, event: MessageEvent, recent_recommendations: dict):
         """顯示收藏清單
 
         Args:
@@ -39,10 +41,10 @@ class FavoriteHandler:
         user_id = event.source.user_id
 
         try:
-            mongodb_obj = MongoDBManage_favorite(self.config)
+            mongodb_obj = await asyncio.to_thread(MongoDBManage_favorite, self.config)
 
-            if mongodb_obj.check_user(user_id):
-                favorites = mongodb_obj.show_favorite(user_id)
+            if await asyncio.to_thread(mongodb_obj.check_user, user_id):
+                favorites = await asyncio.to_thread(mongodb_obj.show_favorite, user_id)
                 if favorites:
                     flex_messages, _ = generate_remove_flex_messages(
                         favorites, user_id)
@@ -52,25 +54,23 @@ class FavoriteHandler:
                         contents=FlexContainer.from_dict(flex_messages)
                     )
 
-                    self.messaging_api.reply_message(
+                    await self.messaging_api.reply_message(
                         ReplyMessageRequest(
                             reply_token=event.reply_token,
                             messages=[flex_message]
                         )
                     )
                 else:
-                    self._send_text_message(event.reply_token, "您的收藏夾是空的")
+                    await self._send_text_message(event.reply_token, "您的收藏夾是空的")
             else:
-                self._send_text_message(event.reply_token, "您沒有收藏任何點位")
-
-            mongodb_obj.close()
+                await self._send_text_message(event.reply_token, "您沒有收藏任何點位")
 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"顯示收藏清單時發生錯誤: {str(e)}")
-            self._send_error_message(event.reply_token)
+            await self._send_error_message(event.reply_token)
 
-    def add_favorite(self, event: MessageEvent, recent_recommendations: dict):
+    async def add_favorite(self, event: MessageEvent, recent_recommendations: dict):
         """新增收藏
 
         Args:
@@ -105,34 +105,34 @@ class FavoriteHandler:
                 }
 
                 # 初始化 MongoDB 管理器並處理收藏
-                mongodb_obj = MongoDBManage_favorite(self.config)
+                mongodb_obj = await asyncio.to_thread(MongoDBManage_favorite, self.config)
 
-                if mongodb_obj.check_user(user_id):
-                    if mongodb_obj.check_place(user_id, place_id):
+                if await asyncio.to_thread(mongodb_obj.check_user, user_id):
+                    if await asyncio.to_thread(mongodb_obj.check_place, user_id, place_id):
                         message = f"已收藏過: {place_name}"
                     else:
-                        if mongodb_obj.fix_favorite(user_id, place_id, place_data):
+                        if await asyncio.to_thread(
+                                mongodb_obj.fix_favorite, user_id, place_id, place_data):
                             message = f"已收藏 {place_name}"
                         else:
                             message = "收藏失敗，請稍後再試"
                 else:
-                    if mongodb_obj.add_user(user_id, place_id, place_data):
+                    if await asyncio.to_thread(
+                            mongodb_obj.add_user, user_id, place_id, place_data):
                         message = f"已收藏 {place_name}"
                     else:
                         message = "收藏失敗，請稍後再試"
-
-                mongodb_obj.close()
             else:
                 message = "找不到該地點的資訊"
 
-            self._send_text_message(event.reply_token, message)
+            await self._send_text_message(event.reply_token, message)
 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"新增收藏時發生錯誤: {str(e)}")
-            self._send_error_message(event.reply_token)
+            await self._send_error_message(event.reply_token)
 
-    def remove_favorite(self, event: MessageEvent):
+    async def remove_favorite(self, event: MessageEvent):
         """移除收藏
 
         Args:
@@ -142,9 +142,9 @@ class FavoriteHandler:
             user_id = event.source.user_id
             place_name = event.message.text[2:]  # 去掉"移除"兩個字
 
-            mongodb_obj = MongoDBManage_favorite(self.config)
+            mongodb_obj = await asyncio.to_thread(MongoDBManage_favorite, self.config)
 
-            favorites = mongodb_obj.show_favorite(user_id)
+            favorites = await asyncio.to_thread(mongodb_obj.show_favorite, user_id)
             if favorites:
                 place_id = next((pid for pid, data in favorites.items()
                                  if data["name"] == place_name), None)
@@ -153,7 +153,8 @@ class FavoriteHandler:
                     if self.logger:
                         self.logger.info(
                             f"移除收藏 - 用戶ID: {user_id}, 地點ID: {place_id}")
-                    if mongodb_obj.delete_favorite(user_id, place_id):
+                    if await asyncio.to_thread(
+                            mongodb_obj.delete_favorite, user_id, place_id):
                         message = f"已刪除: {place_name}"
                     else:
                         message = "刪除失敗，請稍後再試"
@@ -162,37 +163,35 @@ class FavoriteHandler:
             else:
                 message = "您沒有任何收藏"
 
-            mongodb_obj.close()
-
-            self._send_text_message(event.reply_token, message)
+            await self._send_text_message(event.reply_token, message)
 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"移除收藏時發生錯誤: {str(e)}")
-            self._send_error_message(event.reply_token)
+            await self._send_error_message(event.reply_token)
 
-    def _send_text_message(self, reply_token: str, text: str):
+    async def _send_text_message(self, reply_token: str, text: str):
         """發送文字訊息
 
         Args:
             reply_token: LINE的回覆token
             text: 要發送的文字
         """
-        self.messaging_api.reply_message(
+        await self.messaging_api.reply_message(
             ReplyMessageRequest(
                 reply_token=reply_token,
                 messages=[TextMessage(text=text)]
             )
         )
 
-    def _send_error_message(self, reply_token: str):
+    async def _send_error_message(self, reply_token: str):
         """發送錯誤訊息
 
         Args:
             reply_token: LINE的回覆token
         """
         try:
-            self.messaging_api.reply_message(
+            await self.messaging_api.reply_message(
                 ReplyMessageRequest(
                     reply_token=reply_token,
                     messages=[TextMessage(text="系統錯誤，請稍後再試")]
@@ -6,7 +6,9 @@
 2. 更新推薦結果
 """
 
-from linebot.v3.messaging import MessagingApi, ReplyMessageRequest, TextMessage, FlexMessage, FlexContainer
+import asyncio
+
+from linebot.v3.messaging import AsyncMessagingApi, ReplyMessageRequest, TextMessage, FlexMessage, FlexContainer
 from linebot.v3.webhooks import MessageEvent
 from pprint import pprint
 
@@ -20,11 +22,11 @@ from main.main_plan.rerun_reccomend import rerun_rec
 class RecommendHandler:
     """其他推薦功能處理器"""
 
-    def __init__(self, messaging_api: MessagingApi, config: dict, logger=None):
+    def __init__(self, messaging_api: AsyncMessagingApi, config: dict, logger=None):
         """初始化
 
         Args:
-            messaging_api: LINE Bot的MessagingApi實例
+            messaging_api: LINE Bot的AsyncMessagingApi實例
             config: 設定檔內容
             logger: 可選的logger實例
         """
@@ -32,7 +34,7 @@ class RecommendHandler:
         self.config = config
         self.logger = logger
 
-    def recommend_others(self, event: MessageEvent,
+    async def recommend_others(self, event: MessageEvent,
                          recent_recommendations: dict,
                          user_queries: dict):
         """處理推薦其他店家請求
@@ -49,7 +51,7 @@ class RecommendHandler:
         try:
             transformed_data = recent_recommendations.get(user_id, {})
             if not transformed_data:
-                messaging_api.reply_message(
+                await messaging_api.reply_message(
                     ReplyMessageRequest(
                         reply_token=event.reply_token,
                         messages=[TextMessage(text="請先進行情境搜索")]
@@ -61,85 +63,83 @@ class RecommendHandler:
             place_ids = list(transformed_data.keys())
 
             # 修改 mongodb 操作部分
-            mongodb_obj = MongoDBManage_unsatisfied(config)
-            try:
-                mongodb_obj.test_connection()
-                original_query = user_queries.get(
-                    user_id, {})  # 定位到最新的query_info
-                query_info = enrich_query(
-                    original_query, place_ids)  # 將再推薦的place id丟進去
-                if not mongodb_obj.check_user_exists(user_id):  # 判斷line_user
-                    mongodb_obj.add_unsatisfied(query_info)
-                else:
-                    mongodb_obj.update_blacklist(user_id, place_ids)
-
-                print(
-                    f"Original black list count:{len(original_query["black_list"])}")
-                print(
-                    f"Complete black list count:{len(query_info["black_list"])}")
-                print(f"Place IDs being added: {place_ids}")
-
-                # 重新執行推薦
-                final_results = rerun_rec(query_info, config)
-
-                # 處理沒有推薦結果的情況
-                if not final_results:
-                    self.messaging_api.reply_message(
-                        ReplyMessageRequest(
-                            reply_token=event.reply_token,
-                            messages=[TextMessage(text="已經沒有可以推薦的了")]
-                        )
-                    ) 
-                transformed_data = transform_location_data(final_results)
-
-                recent_recommendations[user_id] = transformed_data
-                user_records = mongodb_obj.get_user_records(
-                    user_id)  # 返回 List[Dict]
-                user_queries[user_id] = user_records[0]  # 取出唯一的 Dict
-
-                flex_messages = generate_flex_messages(transformed_data)
-                flex_message = FlexMessage(
-                    alt_text="為您推薦其他地點",
-                    contents=FlexContainer.from_dict(flex_messages)
-                )
-
-                messaging_api.reply_message(
+            mongodb_obj = await asyncio.to_thread(MongoDBManage_unsatisfied, config)
+            await asyncio.to_thread(mongodb_obj.test_connection)
+            original_query = user_queries.get(
+                user_id, {})  # 定位到最新的query_info
+            query_info = enrich_query(
+                original_query, place_ids)  # 將再推薦的place id丟進去
+            if not await asyncio.to_thread(
+                    mongodb_obj.check_user_exists, user_id):  # 判斷line_user
+                await asyncio.to_thread(mongodb_obj.add_unsatisfied, query_info)
+            else:
+                await asyncio.to_thread(
+                    mongodb_obj.update_blacklist, user_id, place_ids)
+
+            print(
+                f"Original black list count:{len(original_query["black_list"])}")
+            print(
+                f"Complete black list count:{len(query_info["black_list"])}")
+            print(f"Place IDs being added: {place_ids}")
+
+            # 重新執行推薦
+            final_results = await asyncio.to_thread(rerun_rec, query_info, config)
+
+            # 處理沒有推薦結果的情況
+            if not final_results:
+                await self.messaging_api.reply_message(
                     ReplyMessageRequest(
                         reply_token=event.reply_token,
-                        messages=[flex_message]
+                        messages=[TextMessage(text="已經沒有可以推薦的了")]
                     )
-                )
+                ) 
+            transformed_data = transform_location_data(final_results)
+
+            recent_recommendations[user_id] = transformed_data
+            user_records = await asyncio.to_thread(
+                mongodb_obj.get_user_records, user_id)  # 返回 List[Dict]
+            user_queries[user_id] = user_records[0]  # 取出唯一的 Dict
+
+            flex_messages = generate_flex_messages(transformed_data)
+            flex_message = FlexMessage(
+                alt_text="為您推薦其他地點",
+                contents=FlexContainer.from_dict(flex_messages)
+            )
 
-            finally:
-                mongodb_obj.close()
+            await messaging_api.reply_message(
+                ReplyMessageRequest(
+                    reply_token=event.reply_token,
+                    messages=[flex_message]
+                )
+            )
 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"推薦其他店家時發生錯誤: {str(e)}")
-            self._send_error_message(event.reply_token)
+            await self._send_error_message(event.reply_token)
 
-    def _send_text_message(self, reply_token: str, text: str):
+    async def _send_text_message(self, reply_token: str, text: str):
         """發送文字訊息
 
         Args:
             reply_token: LINE的回覆token
             text: 要發送的文字
         """
-        self.messaging_api.reply_message(
+        await self.messaging_api.reply_message(
             ReplyMessageRequest(
                 reply_token=reply_token,
                 messages=[TextMessage(text=text)]
             )
         )
 
-    def _send_error_message(self, reply_token: str):
+    async def _send_error_message(self, reply_token: str):
         """發送錯誤訊息
 
         Args:
             reply_token: LINE的回覆token
         """
         try:
-            self.messaging_api.reply_message(
+            await self.messaging_api.reply_message(
                 ReplyMessageRequest(
                     reply_token=reply_token,
                     messages=[TextMessage(text="系統錯誤，請稍後再試")]
@@ -7,31 +7,34 @@
 3. 處理其他推薦請求
 """
 
-from linebot.v3.messaging import MessagingApi, ReplyMessageRequest, TextMessage, FlexMessage, FlexContainer, QuickReply, QuickReplyItem, MessageAction, LocationAction  
+import asyncio
+
+from linebot.v3.messaging import AsyncMessagingApi, ReplyMessageRequest, TextMessage, FlexMessage, FlexContainer, QuickReply, QuickReplyItem, MessageAction, LocationAction  
 from linebot.v3.webhooks import MessageEvent
 from pprint import pprint
 
 from feature.nosql_mongo.mongo_rec.mongoDB_ctrl_disat import MongoDBManage_unsatisfied
+from feature.line.user_state_cache import LRU
 from feature.line.rec_bubble_setting.change_format import transform_location_data
 from feature.line.rec_bubble_setting.line_bubble_changer import generate_flex_messages
 from main.main_plan.recommandation_service import recommandation
 
-# 儲存狀態用的字典
-user_states = {}  # 使用者狀態
-recent_recommendations = {}  # 最近推薦結果
-user_queries = {}  # 查詢紀錄
-user_locations = {}  # 儲存用戶位置信息
+# 儲存狀態用的LRU (超過上限時移除最久沒使用的用戶)
+user_states = LRU()  # 使用者狀態
+recent_recommendations = LRU()  # 最近推薦結果
+user_queries = LRU()  # 查詢紀錄
+user_locations = LRU()  # 儲存用戶位置信息
 
 class ScenarioHandler:
     """情境搜索功能處理器"""
 
-    def __init__(self, messaging_api: MessagingApi, config: dict, logger=None):
+    def __init__(self, messaging_api: AsyncMessagingApi, config: dict, logger=None):
         """初始化"""
         self.messaging_api = messaging_api
         self.config = config
         self.logger = logger
 
-    def handle_scenario_search(self, event: MessageEvent):
+    async def handle_scenario_search(self, event: MessageEvent):
         """處理情境搜索請求"""
         user_id = event.source.user_id
 
@@ -58,7 +61,7 @@ class ScenarioHandler:
             )
 
             # 發送帶有Quick Reply的訊息
-            self.messaging_api.reply_message(
+            await self.messaging_api.reply_message(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=[
@@ -71,17 +74,15 @@ class ScenarioHandler:
             )
             
             # 初始化並清除舊記錄
-            mongodb_obj = MongoDBManage_unsatisfied(self.config)
-            mongodb_obj.delete_user_record(user_id)
-            mongodb_obj.close()
-
+            mongodb_obj = await asyncio.to_thread(MongoDBManage_unsatisfied, self.config)
+            await asyncio.to_thread(mongodb_obj.delete_user_record, user_id)
 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"處理情境搜索時發生錯誤: {str(e)}")
-            self._send_error_message(event.reply_token)
+            await self._send_error_message(event.reply_token)
 
-    def handle_location(self, event):
+    async def handle_location(self, event):
         """處理用戶發送的位置訊息"""
         user_id = event.source.user_id
         
@@ -98,7 +99,7 @@ class ScenarioHandler:
             user_states[user_id] = "waiting_for_query"
 
             # 發送提示訊息
-            self.messaging_api.reply_message(
+            await self.messaging_api.reply_message(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=[TextMessage(text="已收到您的位置！\n請輸入您的需求（例如：請推薦我附近好吃的餐廳）")]
@@ -108,9 +109,9 @@ class ScenarioHandler:
         except Exception as e:
             if self.logger:
                 self.logger.error(f"處理位置資訊時發生錯誤: {str(e)}")
-            self._send_error_message(event.reply_token)
+            await self._send_error_message(event.reply_token)
 
-    def handle_user_query(self, event: MessageEvent) -> bool:   # 確保方法名稱完全一致
+    async def handle_user_query(self, event: MessageEvent) -> bool:   # 確保方法名稱完全一致
         """處理使用者的查詢輸入"""
         user_id = event.source.user_id
         user_text = event.message.text
@@ -138,7 +139,7 @@ class ScenarioHandler:
         if user_states[user_id] == "waiting_for_location":
             if user_text.replace(" ", "") == "跳過" :
                 user_states[user_id] = "waiting_for_query"
-                self.messaging_api.reply_message(
+                await self.messaging_api.reply_message(
                     ReplyMessageRequest(
                         reply_token=event.reply_token,
                         messages=[TextMessage(text="請輸入您的需求（例如：請推薦我好吃的餐廳）")]
@@ -147,7 +148,7 @@ class ScenarioHandler:
                 return True
             else:
                 # 如果不是"跳過"且沒有提供位置，持續要求位置
-                self.messaging_api.reply_message(
+                await self.messaging_api.reply_message(
                     ReplyMessageRequest(
                         reply_token=event.reply_token,
                         messages=[TextMessage(text="請分享您的位置，以便我們提供更精準的推薦\n\n若不方便分享位置，請輸入「跳過」繼續使用。",quickReply=quick_reply)]
@@ -163,7 +164,7 @@ class ScenarioHandler:
         if user_text in ['顯示我的收藏', '推薦其他店家'] or \
            user_text.startswith('收藏店家:') or \
            user_text.startswith('移除'):
-            self.messaging_api.reply_message(
+            await self.messaging_api.reply_message(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=[TextMessage(text="請重新輸入您的需求")]
@@ -179,19 +180,19 @@ class ScenarioHandler:
             user_location = user_locations.get(user_id, None)
             
             # 執行推薦
-            final_results, query_info = recommandation(user_text, self.config, user_location)
+            final_results, query_info = await asyncio.to_thread(
+                recommandation, user_text, self.config, user_location)
 
             # 處理沒有推薦結果的情況
             if not final_results:
-                self.messaging_api.reply_message(
+                await self.messaging_api.reply_message(
                     ReplyMessageRequest(
                         reply_token=event.reply_token,
                         messages=[TextMessage(text="我找過了，真的沒得推薦")]
                     )
                 )
                 # 清除位置資訊
-                if user_id in user_locations:
-                    del user_locations[user_id]
+                user_locations.pop(user_id, None)
                 return True
             # 儲存查詢資訊
             query_info["line_user_id"] = user_id
@@ -207,7 +208,7 @@ class ScenarioHandler:
                 alt_text="為您推薦以下地點",
                 contents=FlexContainer.from_dict(flex_messages)
             )
-            self.messaging_api.reply_message(
+            await self.messaging_api.reply_message(
                 ReplyMessageRequest(
                     reply_token=event.reply_token,
                     messages=[flex_message]
@@ -215,8 +216,7 @@ class ScenarioHandler:
             )
 
             # 清除位置資訊
-            if user_id in user_locations:
-                del user_locations[user_id]
+            user_locations.pop(user_id, None)
 
             return True
 
@@ -225,13 +225,13 @@ class ScenarioHandler:
                 self.logger.error(f"處理查詢時發生錯誤: {str(e)}")
                 import traceback
                 self.logger.error(traceback.format_exc())
-            self._send_error_message(event.reply_token)
+            await self._send_error_message(event.reply_token)
             return True
 
-    def _send_error_message(self, reply_token: str):
+    async def _send_error_message(self, reply_token: str):
         """發送錯誤訊息"""
         try:
-            self.messaging_api.reply_message(
+            await self.messaging_api.reply_message(
                 ReplyMessageRequest(
                     reply_token=reply_token,
                     messages=[TextMessage(text="抱歉，系統處理時發生錯誤，請稍後再試")]
@@ -0,0 +1,41 @@
+"""
+LINE Messaging API 送出請求時改用 orjson 序列化
+
+line-bot-sdk 的 REST client 以標準庫 json.dumps 序列化 request body,
+Flex bubble 這類多層巢狀的訊息序列化成本不低。
+這裡把 SDK REST 模組裡的 json 換成 orjson 版本,
+body 直接以 UTF-8 bytes 送出, 回應解析仍使用標準庫。
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # 沒安裝 orjson 時維持 SDK 原本的 json
+    orjson = None
+
+from linebot.v3.messaging import async_rest, rest
+
+
+class _OrjsonShim:
+    """提供 SDK REST 模組用到的 json.dumps / json.loads"""
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> bytes:
+        return orjson.dumps(obj)
+
+    loads = staticmethod(json.loads)
+
+
+def install_orjson_serializer() -> bool:
+    """讓 LINE SDK 的 REST client 使用 orjson 序列化 request body
+
+    Returns:
+        bool: 是否成功啟用 (未安裝 orjson 時為 False)
+    """
+    if orjson is None:
+        return False
+
+    async_rest.json = _OrjsonShim
+    rest.json = _OrjsonShim
+    return True
@@ -496,3 +496,14 @@ class RichMenuManager:
 
         response = requests.post(url, headers=headers, data=image_data)
         response.raise_for_status()
+
+
+if __name__ == "__main__":
+    # 單獨建立 Rich Menu: python -m feature.line.rich_menu
+    import os
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    menu_ids = RichMenuManager(
+        os.getenv("LINE_CHANNEL_ACCESS_TOKEN")).create_rich_menu()
+    print(f"Rich Menu: {menu_ids}")
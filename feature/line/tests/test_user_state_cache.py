@@ -0,0 +1,36 @@
+from feature.line.user_state_cache import LRU
+
+
+def test_evicts_least_recently_used():
+    """超過上限時移除最久沒使用的用戶"""
+    states = LRU(maxsize=2)
+    states["user_1"] = "waiting_location"
+    states["user_2"] = "waiting_location"
+    states["user_3"] = "waiting_location"
+
+    assert "user_1" not in states
+    assert "user_2" in states
+    assert "user_3" in states
+    assert len(states) == 2
+
+
+def test_get_and_touch_refresh_recency():
+    """get與touch都會把用戶更新為最近使用"""
+    states = LRU(maxsize=2)
+    states["user_1"] = "waiting_for_location"
+    states["user_2"] = "waiting_for_query"
+
+    assert states.get("user_1") == "waiting_for_location"
+    states["user_3"] = "waiting_for_query"
+    assert "user_1" in states
+    assert "user_2" not in states
+
+    assert states.touch("user_3") is True
+    assert states.touch("user_2") is False
+
+
+def test_pop_missing_user_returns_default():
+    """pop不存在的用戶不會出錯"""
+    states = LRU()
+    assert states.pop("user_1", None) is None
+    assert states.get("user_1") is None
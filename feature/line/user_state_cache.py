@@ -0,0 +1,86 @@
+"""
+LINE Bot 使用者狀態的 LRU 快取
+
+使用者狀態(等待位置、最近推薦等)原本存在一般 dict,
+每個新用戶都會留下一筆, 記憶體只增不減。
+這裡用 OrderedDict (內部為雙向鏈結串列) 實作 LRU,
+查詢、更新、淘汰都是 O(1), 超過上限時移除最久沒使用的用戶。
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator
+
+
+class LRU:
+    """有容量上限的使用者狀態字典
+
+    支援 dict 常用操作(in、[]、get、pop、del),
+    讀寫時都會把該用戶移到最新, 超過 maxsize 時移除最舊的用戶。
+
+    使用方式:
+    ```python
+    user_states = LRU(maxsize=100_000)
+    user_states[user_id] = "waiting_for_location"
+
+    if user_states.touch(user_id):
+        ...
+    user_states.pop(user_id, None)
+    ```
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        """初始化
+
+        Args:
+            maxsize: 最多保留的用戶數
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """取得用戶狀態並更新為最近使用"""
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key: Hashable, value: Any):
+        """設定用戶狀態, 超過上限時移除最久沒使用的用戶"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def touch(self, key: Hashable) -> bool:
+        """檢查用戶是否存在, 存在時更新為最近使用
+
+        Returns:
+            bool: 用戶是否存在
+        """
+        if key not in self._data:
+            return False
+        self._data.move_to_end(key)
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """移除用戶狀態並回傳, 不存在時回傳default"""
+        return self._data.pop(key, default)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __setitem__(self, key: Hashable, value: Any):
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable):
+        del self._data[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
@@ -1,9 +1,9 @@
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
 from typing import Optional, Dict, Any, Set, List
 from dotenv import dotenv_values
 from datetime import datetime
 
+from feature.nosql_mongo.mongo_trip.mongodb_manager import get_shared_client
+
 class MongoDBManage_unsatisfied:
     '''
     MongoDB管理 - Travel Router專案使用
@@ -46,7 +46,7 @@ class MongoDBManage_unsatisfied:
         if not self.mongodb_uri:
             raise ValueError("MongoDB URI在設定中是必要的")
             
-        self.client = MongoClient(self.mongodb_uri, server_api=ServerApi('1'))
+        self.client = get_shared_client(self.mongodb_uri)
         self.db = self.client.travel_router
         self.unsatisfied_collection = self.db.recommend_unsatisfied
         
@@ -266,8 +266,12 @@ class MongoDBManage_unsatisfied:
             print(f"刪除用戶記錄時發生錯誤: {e}")
             return False    
     def close(self):
-        """關閉數據庫連接"""
-        self.client.close()
+        """釋放數據庫連接
+
+        client為整個行程共用的連線池, 這裡不關閉,
+        避免影響其他正在使用的handler。
+        """
+        pass
 
 
 # 測試用例
@@ -1,12 +1,7 @@
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
 from typing import Optional, Dict, Any
 from dotenv import dotenv_values
 
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
-from typing import Optional, Dict, Any
-from dotenv import dotenv_values
+from feature.nosql_mongo.mongo_trip.mongodb_manager import get_shared_client
 
 class MongoDBManage_favorite:
     '''
@@ -44,7 +39,7 @@ class MongoDBManage_favorite:
         if not self.mongodb_uri:
             raise ValueError("MongoDB URI is required in config")
             
-        self.client = MongoClient(self.mongodb_uri, server_api=ServerApi('1'))
+        self.client = get_shared_client(self.mongodb_uri)
         self.db = self.client.travel_router
         self.favorite_collection = self.db.recommend_favorite
         
@@ -232,8 +227,12 @@ class MongoDBManage_favorite:
             return None
 
     def close(self):
-        """關閉數據庫連接"""
-        self.client.close()
+        """釋放數據庫連接
+
+        client為整個行程共用的連線池, 這裡不關閉,
+        避免影響其他正在使用的handler。
+        """
+        pass
 
 # 使用示例
 if __name__ == "__main__":
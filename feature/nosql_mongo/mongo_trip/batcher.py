@@ -0,0 +1,120 @@
+"""MongoDB寫入批次合併模組
+
+把短時間內(預設10ms)送進來的寫入操作,
+依collection合併成一次 bulk_write,減少和資料庫來回的次數。
+"""
+
+import asyncio
+from typing import Dict, List, Tuple
+
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+
+class MongoWriteBatcher:
+    """寫入批次合併器
+
+    負責:
+    1. 每個collection各自一個佇列
+    2. 等待delay秒或佇列累積到max_batch筆後一次 bulk_write
+    3. 依操作在批次中的index回傳各自的結果
+
+    使用方式:
+    ```python
+    success = await write_batcher.submit(
+        collection,
+        UpdateOne({"line_id": line_id}, {"$push": {...}}, upsert=True)
+    )
+    ```
+    """
+
+    def __init__(self, max_batch: int = 100, delay: float = 0.01):
+        """初始化
+
+        Args:
+            max_batch: 單次 bulk_write 最多合併的操作數
+            delay: 收到第一筆操作後等待其他操作的秒數
+        """
+        self.max_batch = max_batch
+        self.delay = delay
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._flushers: Dict[str, asyncio.Task] = {}
+
+    async def submit(self, collection: Collection, operation) -> bool:
+        """送出一筆寫入操作
+
+        Args:
+            collection: 要寫入的collection
+            operation: pymongo的寫入操作(UpdateOne、InsertOne等)
+
+        Returns:
+            bool: 該筆操作是否寫入成功
+        """
+        key = collection.full_name
+        if key not in self._queues:
+            self._queues[key] = asyncio.Queue()
+            self._flushers[key] = asyncio.create_task(
+                self._flush_loop(collection, self._queues[key])
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queues[key].put((operation, future))
+        return await future
+
+    async def close(self):
+        """等待佇列內的操作寫完後停止所有flusher"""
+        for queue in self._queues.values():
+            await queue.join()
+        for task in self._flushers.values():
+            task.cancel()
+        self._queues.clear()
+        self._flushers.clear()
+
+    async def _flush_loop(self, collection: Collection, queue: asyncio.Queue):
+        """持續從佇列取出操作並批次寫入"""
+        while True:
+            batch = [await queue.get()]
+
+            # 佇列還沒滿就稍等一下,讓同時間的其他操作一起送出
+            if queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.delay)
+
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self._write(collection, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(
+        self,
+        collection: Collection,
+        batch: List[Tuple[object, asyncio.Future]]
+    ):
+        """執行 bulk_write 並把結果分配回各自的future"""
+        operations = [operation for operation, _ in batch]
+
+        try:
+            await asyncio.to_thread(
+                collection.bulk_write, operations, ordered=False
+            )
+            failed = set()
+        except BulkWriteError as e:
+            # ordered=False 時其他操作仍會寫入,只有出錯的index失敗
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            print(f"批次寫入部分失敗: {len(failed)}/{len(batch)}")
+        except Exception as e:
+            # 任何錯誤(含InvalidDocument、TypeError)都只讓這批失敗,
+            # flusher不能停, 否則之後送進這個collection的操作都會卡住
+            print(f"批次寫入失敗: {str(e)}")
+            failed = set(range(len(batch)))
+
+        for index, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(index not in failed)
+
+
+# 整個行程共用的批次合併器
+write_batcher = MongoWriteBatcher()
@@ -2,10 +2,16 @@ from datetime import datetime, UTC
 from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
+import asyncio
 import pymongo
+from pymongo import UpdateOne
 from pymongo.errors import PyMongoError
+from feature.nosql_mongo.mongo_trip.batcher import write_batcher
 from feature.nosql_mongo.mongo_trip.mongodb_manager import MongoDBManager
 
+# 台北時區只建立一次, 寫入時間戳記時共用
+_TAIPEI_TZ = ZoneInfo('Asia/Taipei')
+
 
 class TripDBHandler:
     """旅遊行程資料庫操作處理器
@@ -36,37 +42,10 @@ class TripDBHandler:
             bool: 是否成功記錄
         """
         try:
-            skip_messages = [
-                "收藏店家:",
-                "顯示我的收藏",
-                "推薦其他店家",
-                "我想進行情境搜索",
-                "情境搜索說明",
-                "旅遊規劃說明",
-                "紀錄初始化",
-                "記錄初始化",
-                "紀錄初始化",
-                "移除",
-                "推薦其他店家",
-            ]
-
-            prefixes = ["旅遊規劃", "旅遊推薦"]
-            if input_text in prefixes:
-                return False
-
-            if any(input_text.startswith(msg) for msg in skip_messages):
+            input_record = self._build_input_record(input_text)
+            if input_record is None:
                 return False  # 直接返回,不記錄
 
-            for prefix in prefixes:
-                if input_text.startswith(prefix):
-                    input_text = input_text[len(prefix):].strip()
-                    break
-
-            input_record = {
-                "timestamp": datetime.now(ZoneInfo('Asia/Taipei')),
-                "text": input_text if input_text.startswith("旅遊推薦") else input_text
-            }
-
             result = self.db.user_preferences.update_one(
                 {"line_id": line_id},
                 {"$push": {"input_history": input_record}},
@@ -79,6 +58,73 @@ class TripDBHandler:
             print(f"記錄用戶輸入失敗: {str(e)}")
             return False
 
+    async def record_user_input_async(
+        self,
+        line_id: str,
+        input_text: str
+    ) -> bool:
+        """記錄用戶輸入(透過write_batcher合併寫入)
+
+        Args:
+            line_id: LINE用戶ID
+            input_text: 用戶輸入文字
+
+        Returns:
+            bool: 是否成功記錄
+        """
+        input_record = self._build_input_record(input_text)
+        if input_record is None:
+            return False
+
+        return await write_batcher.submit(
+            self.db.user_preferences,
+            UpdateOne(
+                {"line_id": line_id},
+                {"$push": {"input_history": input_record}},
+                upsert=True
+            )
+        )
+
+    def _build_input_record(self, input_text: str) -> Optional[Dict]:
+        """建立要寫入input_history的記錄
+
+        Args:
+            input_text: 用戶輸入文字
+
+        Returns:
+            Optional[Dict]: 輸入記錄,不需記錄的指令返回None
+        """
+        skip_messages = [
+            "收藏店家:",
+            "顯示我的收藏",
+            "推薦其他店家",
+            "我想進行情境搜索",
+            "情境搜索說明",
+            "旅遊規劃說明",
+            "紀錄初始化",
+            "記錄初始化",
+            "紀錄初始化",
+            "移除",
+            "推薦其他店家",
+        ]
+
+        prefixes = ["旅遊規劃", "旅遊推薦"]
+        if input_text in prefixes:
+            return None
+
+        if any(input_text.startswith(msg) for msg in skip_messages):
+            return None
+
+        for prefix in prefixes:
+            if input_text.startswith(prefix):
+                input_text = input_text[len(prefix):].strip()
+                break
+
+        return {
+            "timestamp": datetime.now(_TAIPEI_TZ),
+            "text": input_text if input_text.startswith("旅遊推薦") else input_text
+        }
+
     def update_user_dislike(
         self,
         line_id: str,
@@ -100,7 +146,7 @@ class TripDBHandler:
                 {
                     "$push": {
                         "input_history": {
-                            "timestamp": datetime.now(ZoneInfo('Asia/Taipei')),
+                            "timestamp": datetime.now(_TAIPEI_TZ),
                             "text": dislike_reason
                         }
                     }
@@ -113,6 +159,36 @@ class TripDBHandler:
             print(f"更新用戶偏好失敗: {str(e)}")
             return False
 
+    async def update_user_dislike_async(
+        self,
+        line_id: str,
+        dislike_reason: str
+    ) -> bool:
+        """更新用戶不喜歡的項目(透過write_batcher合併寫入)
+
+        Args:
+            line_id: 用戶ID
+            dislike_reason: 不喜歡的原因(例如:"我不喜歡遼寧街夜市(夜市)")
+
+        Returns:
+            bool: 是否更新成功
+        """
+        return await write_batcher.submit(
+            self.db.user_preferences,
+            UpdateOne(
+                {"line_id": line_id},
+                {
+                    "$push": {
+                        "input_history": {
+                            "timestamp": datetime.now(_TAIPEI_TZ),
+                            "text": dislike_reason
+                        }
+                    }
+                },
+                upsert=True
+            )
+        )
+
     def update_plan_restart_index(
         self,
         line_id: str,
@@ -120,53 +196,72 @@ class TripDBHandler:
         restart_index: int,
         button_id: str
     ) -> bool:
-        try:
-            record = self.db.planner_records.find_one({
-                "line_id": line_id,
-                "plan_index": plan_index,
-            })
+        """更新行程的restart_index並記錄按過的按鈕
 
-            if not record:
-                print(f"找不到行程記錄 plan_index={plan_index}")
-                return False
+        以單一 find_one_and_update 完成: 只有按鈕還沒按過的記錄會被更新,
+        restart_index 以 $min 保留較小的值, 不需先讀出記錄比較。
 
-            print(f"目前record: {record}")  # debug記錄
+        Args:
+            line_id: 用戶ID
+            plan_index: 第幾個行程
+            restart_index: 要重新規劃的起點
+            button_id: 按鈕ID(例如:"cancel_3_5")
 
-            if "clicked_buttons" not in record:
-                self.db.planner_records.update_one(
-                    {"line_id": line_id, "plan_index": plan_index},
-                    {"$set": {"clicked_buttons": []}}
-                )
-                print("初始化clicked_buttons陣列")
+        Returns:
+            bool: 是否更新成功(找不到記錄或按鈕已按過時為False)
+        """
+        try:
+            record = self.db.planner_records.find_one_and_update(
+                {
+                    "line_id": line_id,
+                    "plan_index": plan_index,
+                    "clicked_buttons": {"$ne": button_id}
+                },
+                {
+                    "$push": {"clicked_buttons": button_id},
+                    "$min": {"restart_index": restart_index},
+                    "$set": {"updated_at": datetime.now(_TAIPEI_TZ)}
+                },
+                projection={"_id": 1}
+            )
 
-            if button_id in record.get("clicked_buttons", []):
-                print(f"按鈕 {button_id} 已經按過")
+            if record is None:
+                print(f"找不到行程記錄或按鈕 {button_id} 已經按過")
                 return False
-
-            current_restart = record.get('restart_index', float('inf'))
-            print(f"比較 current: {current_restart}, new: {restart_index}")
-
-            update_data = {
-                "$push": {"clicked_buttons": button_id}
-            }
-
-            if restart_index < current_restart:
-                update_data["$set"] = {
-                    "restart_index": restart_index,
-                    "updated_at": datetime.now(ZoneInfo('Asia/Taipei'))
-                }
-                print(f"更新 restart_index 為 {restart_index}")
-
-            result = self.db.planner_records.update_one(
-                {"line_id": line_id, "plan_index": plan_index},
-                update_data
-            )
-            return result.modified_count > 0
+            return True
 
         except PyMongoError as e:
             print(f"更新重啟點失敗: {str(e)}")
             return False
 
+    async def record_cancel_and_dislike(
+        self,
+        line_id: str,
+        plan_index: int,
+        restart_index: int,
+        button_id: str,
+        dislike_reason: str
+    ) -> bool:
+        """處理行程的取消按鈕: 更新restart_index, 成功後記錄不喜歡的項目
+
+        Args:
+            line_id: 用戶ID
+            plan_index: 第幾個行程
+            restart_index: 要重新規劃的起點
+            button_id: 按鈕ID(例如:"cancel_3_5")
+            dislike_reason: 不喜歡的原因(例如:"我不喜歡遼寧街夜市(夜市)")
+
+        Returns:
+            bool: 是否為第一次按下此按鈕並更新成功
+        """
+        success = await asyncio.to_thread(
+            self.update_plan_restart_index,
+            line_id, plan_index, restart_index, button_id
+        )
+        if success:
+            await self.update_user_dislike_async(line_id, dislike_reason)
+        return success
+
     def update_user_location(
         self,
         line_id: str,
@@ -237,7 +332,7 @@ class TripDBHandler:
             record = {
                 "line_id": line_id,
                 "plan_index": new_index,
-                "timestamp": datetime.now(ZoneInfo('Asia/Taipei')),
+                "timestamp": datetime.now(_TAIPEI_TZ),
                 "input_text": input_text,
                 "requirement": requirement,
                 # "restart_index": restart_index,
@@ -434,7 +529,7 @@ class TripDBHandler:
                 {
                     "$set": {
                         "preferences_summary": summary,
-                        "last_summary_time": datetime.now(ZoneInfo('Asia/Taipei'))
+                        "last_summary_time": datetime.now(_TAIPEI_TZ)
                     }
                 },
                 upsert=True
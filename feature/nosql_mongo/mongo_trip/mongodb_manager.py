@@ -1,8 +1,34 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 import pymongo
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
+from pymongo.server_api import ServerApi
+
+
+@lru_cache(maxsize=None)
+def get_shared_client(mongodb_uri: str) -> MongoClient:
+    """取得整個行程共用的MongoClient
+
+    同一個連線字串只會建立一次client(固定使用Stable API "1"),
+    所有handler共用同一個連線池, 不必每個請求重新做TCP+TLS握手。
+
+    Args:
+        mongodb_uri: MongoDB連線字串
+
+    Returns:
+        MongoClient: 共用的client實例
+    """
+    return MongoClient(
+        mongodb_uri,
+        maxPoolSize=int(os.getenv('MONGODB_MAX_POOL_SIZE', 50)),
+        minPoolSize=5,
+        waitQueueTimeoutMS=2000,
+        serverSelectionTimeoutMS=3000,
+        retryWrites=True,
+        server_api=ServerApi('1'),
+    )
 
 
 class MongoDBManager:
@@ -30,7 +56,7 @@ class MongoDBManager:
             load_dotenv()
             MONGODB_URI = os.getenv('MONGODB_URI', "mongodb://localhost:27017")
             
-            self.client = MongoClient(MONGODB_URI)
+            self.client = get_shared_client(MONGODB_URI)
             self.db = self.client.travel_router
             self.planner_records = self.db.planner_records
             self.user_preferences = self.db.user_preferences
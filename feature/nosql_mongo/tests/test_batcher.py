@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from feature.nosql_mongo.mongo_trip.batcher import MongoWriteBatcher
+
+
+def make_collection(name: str = "travel_router.user_preferences") -> MagicMock:
+    """建立測試用的collection"""
+    collection = MagicMock()
+    collection.full_name = name
+    return collection
+
+
+def make_update(line_id: str) -> UpdateOne:
+    """建立測試用的寫入操作"""
+    return UpdateOne(
+        {"line_id": line_id},
+        {"$push": {"input_history": {"text": "test"}}},
+        upsert=True
+    )
+
+
+def test_concurrent_writes_share_one_bulk_write():
+    """同時送出的寫入應合併成一次bulk_write"""
+    collection = make_collection()
+
+    async def run():
+        batcher = MongoWriteBatcher(max_batch=100, delay=0.01)
+        results = await asyncio.gather(
+            *[batcher.submit(collection, make_update(f"user_{i}")) for i in range(5)]
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == [True] * 5
+    assert collection.bulk_write.call_count == 1
+    operations = collection.bulk_write.call_args.args[0]
+    assert len(operations) == 5
+    assert collection.bulk_write.call_args.kwargs == {"ordered": False}
+
+
+def test_max_batch_splits_bulk_write():
+    """超過max_batch時應分成多次bulk_write"""
+    collection = make_collection()
+
+    async def run():
+        batcher = MongoWriteBatcher(max_batch=2, delay=0.01)
+        await asyncio.gather(
+            *[batcher.submit(collection, make_update(f"user_{i}")) for i in range(5)]
+        )
+        await batcher.close()
+
+    asyncio.run(run())
+
+    assert collection.bulk_write.call_count == 3
+
+
+def test_partial_failure_only_fails_that_operation():
+    """bulk_write部分失敗時,只有出錯的操作回傳False"""
+    collection = make_collection()
+    collection.bulk_write.side_effect = BulkWriteError({
+        "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+        "upserted": [],
+    })
+
+    async def run():
+        batcher = MongoWriteBatcher(max_batch=100, delay=0.01)
+        results = await asyncio.gather(
+            *[batcher.submit(collection, make_update(f"user_{i}")) for i in range(3)]
+        )
+        await batcher.close()
+        return results
+
+    assert asyncio.run(run()) == [True, False, True]
+
+
+def test_collections_are_batched_separately():
+    """不同collection各自進行bulk_write"""
+    preferences = make_collection("travel_router.user_preferences")
+    records = make_collection("travel_router.planner_records")
+
+    async def run():
+        batcher = MongoWriteBatcher(max_batch=100, delay=0.01)
+        await asyncio.gather(
+            batcher.submit(preferences, make_update("user_1")),
+            batcher.submit(records, make_update("user_1")),
+            batcher.submit(preferences, make_update("user_2")),
+        )
+        await batcher.close()
+
+    asyncio.run(run())
+
+    assert preferences.bulk_write.call_count == 1
+    assert len(preferences.bulk_write.call_args.args[0]) == 2
+    assert records.bulk_write.call_count == 1
+
+
+def test_unexpected_error_keeps_flusher_alive():
+    """bulk_write丟出非PyMongo錯誤時,該批失敗但之後的寫入仍可完成"""
+    collection = make_collection()
+    collection.bulk_write.side_effect = [TypeError("bad document"), None]
+
+    async def run():
+        batcher = MongoWriteBatcher(max_batch=100, delay=0.01)
+        first = await asyncio.wait_for(
+            batcher.submit(collection, make_update("user_1")), timeout=1
+        )
+        second = await asyncio.wait_for(
+            batcher.submit(collection, make_update("user_2")), timeout=1
+        )
+        await batcher.close()
+        return first, second
+
+    assert asyncio.run(run()) == (False, True)
+    assert collection.bulk_write.call_count == 2
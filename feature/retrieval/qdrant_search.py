@@ -1,7 +1,7 @@
 from qdrant_client import QdrantClient, models
 from dotenv import dotenv_values
 
-from .utils.jina_embedding import jina_embedding
+from .utils.jina_embedding import jina_embedding, jina_embedding_batch
 from .utils.qdrant_control import qdrant_manager
 
 class qdrant_search:
@@ -36,6 +36,7 @@ class qdrant_search:
         ```
         .cloud_search( input_query: list[str] = ["形容客戶行程的一句話"] )
         .trip_search( input_query: dict[list] = { "上午" : "形容客戶行程的一句話"})
+        .trip_search_batch( period_describe: list[dict] = [{ "上午" : "形容客戶行程的一句話"}, ...])
         ```
     '''
     def __init__(
@@ -129,6 +130,43 @@ class qdrant_search:
 
         return {period : result}
 
+    def trip_search_batch(self, period_describe: list[dict])-> dict[list]: 
+        '''
+        - 對旅遊演算法, 所有時段一次向量化、一次 search_batch 搜尋
+        - input :
+
+            ```
+            period_describe: list[dict] = [
+                { "上午" : "形容客戶行程的一句話"},
+                { "中餐" : "形容客戶行程的一句話"},
+            ]
+            ```
+        output :
+
+            ```
+            return { period : ["PlaceID", "PlaceID", …, "PlaceID"], ...} 
+            ```
+        '''
+        if not period_describe:
+            return {}
+
+        config = self.config
+        periods, texts = zip(*(next(iter(query.items())) for query in period_describe))
+
+        # 1. 所有時段的描述一次向量化
+        vectors = jina_embedding_batch(list(texts), config['jina_url'], config['jina_headers_Authorization'])
+
+        # 2. 一次 search_batch 搜尋全部時段
+        qdrant_obj = qdrant_manager(collection_name=self.colleciton_name, 
+                                    qdrant_url=config.get("qdrant_url"),
+                                    qdrant_api_key= config.get("qdrant_api_key"))
+        results = qdrant_obj.search_vector_batch(vectors, self.score_threshold, self.limit, self.black_list)
+
+        return {
+            period: list(match_data.keys())
+            for period, match_data in zip(periods, results)
+        }
+
 
 if __name__ == "__main__":
     # 加載環境變量
@@ -1,5 +1,13 @@
+import threading
+from collections import OrderedDict
+
 import requests
 
+# 向量快取 : 相同的描述句不再重複呼叫 jina  { (jina_url, 句子) : (1024 維浮點數) }
+_EMBEDDING_CACHE_SIZE = 4096
+_embedding_cache: OrderedDict = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
 def jina_embedding(input_data: list[str], placeID: str,jina_url:str, jina_headers_Authorization:str) ->dict:
     '''
     - 輸入變數 : 
@@ -63,6 +71,69 @@ def jina_embedding(input_data: list[str], placeID: str,jina_url:str, jina_header
         print(response.text)
 
 
+def jina_embedding_batch(input_data: list[str], jina_url: str, jina_headers_Authorization: str) -> list[list]:
+    '''
+    - 一次請求將多句文字分別向量化
+    - 已向量化過的句子直接使用快取 (最多 4096 句)
+
+    - 輸入變數 : 
+
+        ```
+        jina_embedding_batch(
+            input_data : ['句子1', '句子2', ...]
+            jina_url : 'API key'
+            jina_headers_Authorization : 'header'
+        )
+        ```
+
+    - 輸出變數 : 
+
+        ```
+        [ [1024 維浮點數], [1024 維浮點數], ... ]   # 與 input_data 順序相同
+        ```
+    '''
+    # 先從快取取, 只把沒看過的句子送去 jina
+    vectors = {}
+    with _embedding_cache_lock:
+        for text in input_data:
+            key = (jina_url, text)
+            if key in _embedding_cache:
+                _embedding_cache.move_to_end(key)
+                vectors[text] = _embedding_cache[key]
+    missing = list(dict.fromkeys(text for text in input_data if text not in vectors))
+
+    if missing:
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': jina_headers_Authorization
+        }
+        data = {
+            "model": "jina-embeddings-v3",
+            "task": "text-matching",
+            "late_chunking": False,
+            "dimensions": 1024,
+            "embedding_type": "float",
+            "input": missing
+        }
+
+        response = requests.post(jina_url, headers=headers, json=data)
+
+        if response.status_code != 200:
+            print(f"請求失敗, HTTP 狀態碼: {response.status_code}")
+            print(response.text)
+            response.raise_for_status()
+
+        # 依 index 排回輸入順序, 以 tuple 存入快取避免被呼叫端修改
+        items = sorted(response.json()['data'], key=lambda item: item['index'])
+        with _embedding_cache_lock:
+            for text, item in zip(missing, items):
+                vectors[text] = tuple(item['embedding'])
+                _embedding_cache[(jina_url, text)] = vectors[text]
+            while len(_embedding_cache) > _EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    return [list(vectors[text]) for text in input_data]
+
 if __name__ == "__main__" :
     from dotenv import dotenv_values
 
@@ -1,7 +1,22 @@
+from functools import lru_cache
+
 from dotenv import dotenv_values
 from qdrant_client import QdrantClient
 from qdrant_client import models
 
+
+@lru_cache(maxsize=None)
+def get_shared_qdrant_client(qdrant_url: str, qdrant_api_key: str) -> QdrantClient:
+    '''
+    - 同一組 url / api_key 只建立一次 QdrantClient
+    - 所有 qdrant_manager 共用同一個 HTTP 連線池, 不必每次搜尋重新連線
+    '''
+    return QdrantClient(
+            url=qdrant_url, 
+            api_key=qdrant_api_key,
+            timeout=20,
+        )
+
 class qdrant_manager:
     '''
     - #### 查詢
@@ -39,12 +54,8 @@ class qdrant_manager:
                     collection_name: str|None = 'collection_name', 
                     qdrant_url: str = 'your_qdrant_url', 
                     qdrant_api_key: str = 'your_qdrant_api_key')-> any:
-        # 加載環境變量
-        self.qdrant_client = QdrantClient(
-                url=qdrant_url, 
-                api_key=qdrant_api_key,
-                timeout=20,
-            )
+        # 共用 client
+        self.qdrant_client = get_shared_qdrant_client(qdrant_url, qdrant_api_key)
         
         # 設定控制桶子
         self.collection_name = collection_name
@@ -131,6 +142,53 @@ class qdrant_manager:
 
         return [match_data]
 
+    def search_vector_batch(self, vectors: list[list], score_threshold: float, limit: int, black_list: list=[]):
+        '''
+        - 多個 vector 以一次 search_batch 請求搜尋
+        - 參數同 search_vector
+        - 回傳 : 與 vectors 順序相同的 match_data 列表
+        
+            ```
+            return [
+                {"Place ID 1":{"分數":"int"}, ...},   # vectors[0] 的結果
+                {"Place ID 1":{"分數":"int"}, ...},   # vectors[1] 的結果
+            ]
+            ```
+        '''
+        filter_condition = models.Filter(
+            must_not=[
+                models.FieldCondition(
+                    key="placeID",
+                    match=models.MatchAny(any=black_list),
+                )
+            ]
+        )
+
+        requests = [
+            models.SearchRequest(
+                vector=vector,
+                score_threshold=score_threshold,
+                limit=limit,
+                filter=filter_condition,
+                with_payload=True,
+            )
+            for vector in vectors
+        ]
+
+        results = self.qdrant_client.search_batch(
+                collection_name=self.collection_name,
+                requests=requests,
+            )
+
+        batch_match_data = []
+        for result in results:
+            match_data = {}
+            for point in result:
+                match_data[point.payload['placeID']] = {"分數": point.score}
+            batch_match_data.append(match_data)
+
+        return batch_match_data
+
 
     def get_points(self, limit=10, payload_key=False):
         '''
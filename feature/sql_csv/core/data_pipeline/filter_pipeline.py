@@ -1,4 +1,4 @@
-from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import ETL_dataframe_generate
+from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import place_index_generate
 from feature.sql_csv.core.data_pipeline.utils.classify_restaurant_or_view import classify_restaurant_or_view
 from feature.sql_csv.core.data_pipeline.utils.special_request import special_request
 
@@ -19,7 +19,7 @@ def filter_pipeline(
     return :
         placeID_list : ["PlaceID1", "PlaceID2", ..., "PlaceIDN"]
     '''
-    ETL_dataframe = ETL_dataframe_generate()
+    place_index = place_index_generate()
 
     # 第一節 : 餐廳景點篩選
     if restaurant_view_classify in ['restaurant', 'view']:
@@ -27,7 +27,7 @@ def filter_pipeline(
         placeID_list = classify_restaurant_or_view(
                                         placeID_list=placeID_list,
                                         restaurant_view_classify=restaurant_view_classify,
-                                        ETL_dataframe=ETL_dataframe,
+                                        place_index=place_index,
                                         )
     else : print('不進行餐廳景點篩選')
     
@@ -37,7 +37,7 @@ def filter_pipeline(
         placeID_list = special_request(
                         placeID_list=placeID_list,
                         special_request_list=special_request_list,
-                        ETL_dataframe=ETL_dataframe,
+                        place_index=place_index,
                     )
     else : print('不進行特殊篩選')
 
@@ -1,10 +1,24 @@
+from functools import lru_cache
+
 import pandas as pd
 
 def ETL_dataframe_generate(filepath = 'data/ETL_dataframe.csv'):
     ETL_dataframe = pd.read_csv(filepath, index_col='place_id')
     return ETL_dataframe
 
+@lru_cache(maxsize=None)
+def place_index_generate(filepath = 'data/ETL_dataframe.csv'):
+    '''
+    讀取 ETL csv 並轉成 { place_id : {欄位: 值} } 的查詢表, 同一個 filepath 只讀一次
+    (篩選與製造 points 都是以 place_id 查單筆, 用 dict 查詢取代 dataframe .loc)
+    '''
+    ETL_dataframe = pd.read_csv(filepath, index_col='place_id')
+    return ETL_dataframe.to_dict(orient='index')
+
 
 if __name__ == '__main__' :
     ETL_dataframe = ETL_dataframe_generate()
-    print(ETL_dataframe)
\ No newline at end of file
+    print(ETL_dataframe)
+
+    place_index = place_index_generate()
+    print(len(place_index))
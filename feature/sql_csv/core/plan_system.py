@@ -2,7 +2,7 @@
 
 from feature.sql_csv.core.data_pipeline.filter_pipeline import filter_pipeline
 from feature.sql_csv.core.point_maker.plan_point_maker import plan_point_make
-from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import ETL_dataframe_generate
+from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import place_index_generate
 
 def plan_system(system_input: list[dict], special_request_list):
     '''
@@ -26,12 +26,12 @@ def plan_system(system_input: list[dict], special_request_list):
     
     # 製造 points
     points = []
-    ETL_dataframe = ETL_dataframe_generate()
+    place_index = place_index_generate()
     for placeID in placeID_list:
         point = plan_point_make(
                                 place_ID=placeID,
                                 retrival_score=system_input[0][placeID]['分數'],
-                                ETL_dataframe=ETL_dataframe,
+                                place_index=place_index,
                             )
         points.append(point)
 
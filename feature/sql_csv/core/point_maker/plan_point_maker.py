@@ -1,12 +1,12 @@
 import ast
 
-def plan_point_make(place_ID: str, retrival_score: float, ETL_dataframe):
+def plan_point_make(place_ID: str, retrival_score: float, place_index):
     '''
     ```
     Args:
         place_ID : 單個 place_ID
         retrival_score : 向量搜尋相似度分數
-        ETL_dataframe : ETL csv dataframe
+        place_index : { place_id : {欄位: 值} } 查詢表
     return :
         point : 給 情境搜尋端 的單個point格式
     ```
@@ -40,7 +40,7 @@ def plan_point_make(place_ID: str, retrival_score: float, ETL_dataframe):
         ```
     '''
 
-    filter_series = ETL_dataframe.loc[place_ID]
+    filter_series = place_index[place_ID]
     no_image_url = 'https://media.istockphoto.com/id/931643150/zh/%E5%90%91%E9%87%8F/%E5%9C%96%E7%89%87%E5%9C%96%E7%A4%BA.webp?s=2048x2048&w=is&k=20&c=7L5x36ta5Z8th81qi-8YwRgnnv3s3_KlazZXaG8sIgU='
     point = {
                 'placeID': place_ID,
@@ -65,15 +65,15 @@ def plan_point_make(place_ID: str, retrival_score: float, ETL_dataframe):
 if __name__ == '__main__':
     from pprint import pprint
 
-    from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import ETL_dataframe_generate
-    ETL_dataframe = ETL_dataframe_generate()
+    from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import place_index_generate
+    place_index = place_index_generate()
     place_ID = 'ChIJqelWmSGnQjQR0oQv0a6ZJ8o'  # 康小玲      ['外帶外送', '其他支付']
     retrival_score = 0.7
 
     point = plan_point_make(
                 place_ID= place_ID,
                 retrival_score= retrival_score,
-                ETL_dataframe= ETL_dataframe,
+                place_index= place_index,
             )
 
     pprint(point, sort_dicts=False)
\ No newline at end of file
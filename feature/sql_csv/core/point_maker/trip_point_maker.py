@@ -1,11 +1,11 @@
 import ast
-def trip_point_make(place_ID: str, period: str, ETL_dataframe):
+def trip_point_make(place_ID: str, period: str, place_index):
     '''
     ```
     Args:
         place_ID : 單個 place_ID
         period : lunch|dinner|morning|afternoon|night 
-        ETL_dataframe : ETL csv dataframe
+        place_index : { place_id : {欄位: 值} } 查詢表
     return :
         point : 給 旅遊推薦端 的單個point格式
     ```
@@ -27,7 +27,7 @@ def trip_point_make(place_ID: str, period: str, ETL_dataframe):
         }
         ```
     '''
-    filter_series = ETL_dataframe.loc[place_ID]
+    filter_series = place_index[place_ID]
     point = {                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                                      
                 'place_id' : place_ID,
                 'name' : filter_series['place_name'],
@@ -44,17 +44,17 @@ def trip_point_make(place_ID: str, period: str, ETL_dataframe):
     return point
     
 if __name__ == '__main__':
-    from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import ETL_dataframe_generate
+    from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import place_index_generate
     from pprint import pprint
 
-    ETL_dataframe = ETL_dataframe_generate()
+    place_index = place_index_generate()
     place_ID = 'ChIJqelWmSGnQjQR0oQv0a6ZJ8o'  # 康小玲      ['外帶外送', '其他支付']
     period = 'morning'
 
     point = trip_point_make(
                 place_ID=place_ID,
                 period=period,
-                ETL_dataframe=ETL_dataframe,
+                place_index=place_index,
             )
     
     pprint(point, sort_dicts=False)
\ No newline at end of file
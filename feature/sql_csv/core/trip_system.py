@@ -1,6 +1,6 @@
 from feature.sql_csv.core.data_pipeline.filter_pipeline import filter_pipeline
 from feature.sql_csv.core.point_maker.trip_point_maker import trip_point_make
-from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import ETL_dataframe_generate
+from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import place_index_generate
 
 
 def trip_system(system_input, special_request_list):
@@ -45,14 +45,14 @@ def trip_system(system_input, special_request_list):
             system_input[period] = placeID_list
 
     # 製造 points
-    ETL_dataframe = ETL_dataframe_generate()
+    place_index = place_index_generate()
     points = []
     for period, placeID_list in system_input.items():
         for place_ID in placeID_list:
             point = trip_point_make(
                 place_ID=place_ID,
                 period=period,
-                ETL_dataframe=ETL_dataframe,
+                place_index=place_index,
             )
             points.append(point)
 
@@ -1,6 +1,15 @@
 
 from feature.sql_csv.core.plan_system import plan_system
 from feature.sql_csv.core.trip_system import trip_system
+from feature.sql_csv.core.data_pipeline.utils.ETL_dataframe_generate import place_index_generate
+
+
+def preload_dataframe():
+    '''
+    預先讀取 ETL csv 並建好 place_id 查詢表, 之後的 pandas_search 直接使用快取
+    '''
+    return place_index_generate()
+
 
 def pandas_search(  
                     system: str,
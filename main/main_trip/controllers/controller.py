@@ -1,16 +1,43 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from typing import Dict, List, Tuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import pandas as pd
 
 from feature.llm.LLM import LLM_Manager
 from feature.retrieval.qdrant_search import qdrant_search
-from feature.sql_csv.sql_csv import pandas_search
+from feature.sql_csv.sql_csv import pandas_search, preload_dataframe
 from feature.nosql_mongo.mongo_trip.db_helper import trip_db
 from feature.trip.trip import TripPlanningSystem
 
+# 所有 controller 共用的背景執行緒, 只跑短的資料庫查詢和一次性的 csv 預載
+# (LLM 呼叫要好幾秒, 留在呼叫端的執行緒, 不佔用這裡的名額)
+_executor = ThreadPoolExecutor(max_workers=8)
+
+
+@lru_cache(maxsize=None)
+def _load_duration_dict(filepath: str = 'data/emotion_analysis.csv') -> Dict:
+    """讀取各地點的停留時間, 同一個檔案只讀一次
+
+    Returns:
+        Dict: {placeID: 停留時間(分鐘)}
+    """
+    duration_df = pd.read_csv(filepath)
+    return duration_df.set_index('placeID')['停留時間'].to_dict()
+
+
+def _preload_tables():
+    """預先讀取地點資料與停留時間表"""
+    preload_dataframe()
+    _load_duration_dict()
+
+
+# 載入模組時就在背景預讀 csv, 整個行程只做一次
+_preload_future = _executor.submit(_preload_tables)
+
+
 class TripController:
     """行程規劃系統控制器"""
 
@@ -29,6 +56,12 @@ class TripController:
         self.config = config
         self.LLM_obj = LLM_Manager(self.config['ChatGPT_api_key'])
         self.trip_planner = TripPlanningSystem()
+        self.qdrant_obj = qdrant_search(
+            collection_name='view_restaurant',
+            config=self.config,
+            score_threshold=0.5,
+            limit=100
+        )
 
     def process_message(
         self,
@@ -52,24 +85,32 @@ class TripController:
             # 1. 記錄用戶輸入
             # trip_db.record_user_input(line_id, input_text)
             
+            # 用戶位置、之前的行程、歷史狀態互不相依, 同時向資料庫查詢
+            location_future = _executor.submit(trip_db.get_user_location, line_id)
+            latest_future = _executor.submit(trip_db.get_latest_plan, line_id=line_id)
+            history_future = _executor.submit(trip_db.get_history_status, line_id)
+
             # 取得用戶的位置
-            user_location = trip_db.get_user_location(line_id)
+            user_location = location_future.result()
 
             # 2. 取得之前的行程
-            latest = trip_db.get_latest_plan(line_id=line_id)
+            latest = latest_future.result()
             latest_itinerary = latest.get('itinerary') if latest else None
 
             # 3. 準備給LLM的文字(包含歷史整理)
             input_for_LLM = self._prepare_input_text(
                 text=input_text,
                 line_id=line_id,
-                previous_trip=latest_itinerary
+                previous_trip=latest_itinerary,
+                history=history_future.result()
             )
 
             # 4. LLM意圖分析
             period_describe, unique_requirement, base_requirement, restart_index = (
                 self._analyze_intent(text=input_for_LLM)
             )
+            # 預載失敗時不在這裡拋錯, 之後的查詢會自己重新讀取
+            wait([_preload_future])
 
             if latest and 'restart_index' in latest:
                 restart_index = latest.get('restart_index', 0)
@@ -127,7 +168,7 @@ class TripController:
 
     def _vector_retrieval(self, period_describe: List[Dict]) -> Dict:
         """
-        平行處理多個時段的向量搜尋
+        以一次批次請求處理多個時段的向量搜尋
 
         Args:
             period_describe: List[Dict] 
@@ -145,36 +186,8 @@ class TripController:
                 }
         """
         try:
-            # 建立 qdrant_search 實例
-            qdrant_obj = qdrant_search(
-                collection_name='view_restaurant',
-                config=self.config,
-                score_threshold=0.5,
-                limit=100
-            )
-            # period_describe = [
-            #     {'上午': '喜歡在文青咖啡廳裡享受幽靜且美麗的裝潢'},
-            #     {'中餐': '好吃很辣便宜加飯附湯環境整潔很多人可以停車'},
-            #     {'下午': '充滿歷史感的日式建築'},
-            #     {'晚餐': '適合多人聚餐的餐廳'},
-            #     {'晚上': '可以看夜景的地方'}
-            # ]
-
-            # 使用 ThreadPoolExecutor 進行平行處理
-            results = {}
-            with ThreadPoolExecutor() as executor:
-                future_to_query = {
-                    executor.submit(qdrant_obj.trip_search, query): query
-                    for query in period_describe
-                }
-
-                for future in future_to_query:
-                    try:
-                        result = future.result()
-                        results.update(result)
-                    except Exception as e:
-                        print(f"搜尋過程發生錯誤: {str(e)}")
-                        continue
+            # 所有時段以一次 search_batch 請求查詢
+            results = self.qdrant_obj.trip_search_batch(period_describe)
 
             return results
 
@@ -217,12 +230,8 @@ class TripController:
             List[Dict] - 加入duration後的地點列表
         """
         try:
-            # 讀取duration資料
-            duration_df = pd.read_csv('data/emotion_analysis.csv')
-
-            # 建立查找字典
-            duration_dict = duration_df.set_index(
-                'placeID')['停留時間'].to_dict()
+            # 取得duration查找字典 (只在第一次讀取csv)
+            duration_dict = _load_duration_dict()
 
             # 為每個地點加入duration
             for place in places:
@@ -271,15 +280,20 @@ class TripController:
         self,
         text: str = "",
         line_id: str = "test_user_id",
-        previous_trip: List[Dict] = None
+        previous_trip: List[Dict] = None,
+        history: Dict = None
     ) -> str:
         """準備給LLM的輸入文字
 
+        Args:
+            history: 已查好的歷史狀態(選填), 沒有則向資料庫查詢
+
         Returns:
             str: 組合後的輸入文字
         """
         # 取得歷史狀態
-        history = trip_db.get_history_status(line_id)
+        if history is None:
+            history = trip_db.get_history_status(line_id)
 
         # 需要整理就先整理和儲存
         if history["needs_summary"]: